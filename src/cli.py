@@ -28,11 +28,21 @@ from typing import Optional, List
 
 import typer
 
-# Opcjonalnie: ładniejsze printy, ale nie jest wymagane do działania
-try:
-    from rich import print      # type: ignore
-except Exception:               # pragma: no cover
-    pass
+# Opcjonalnie: ładniejsze printy, ale nie jest wymagane do działania.
+# rich importujemy dopiero przy pierwszym printcie - procesy puli (spawn) importują ten
+# moduł ponownie jako `__mp_main__` i nie powinny płacić za import rich.
+_builtin_print = print
+
+
+def print(*args, **kwargs):     # type: ignore
+    """`rich.print`, jeśli rich jest dostępny, inaczej wbudowany print (leniwy import)."""
+    global print
+    try:
+        from rich import print as rich_print    # type: ignore
+    except Exception:                           # pragma: no cover
+        rich_print = _builtin_print
+    print = rich_print
+    rich_print(*args, **kwargs)
 
 from .model import Params, SubsetConfig
 from .io import read_json, iter_instances, apply_subset
@@ -60,9 +70,19 @@ def _merge_overrides(
     lambda_: Optional[float],
     early_patience: Optional[int],
     early_delta: Optional[float],
-    seeds_csv: Optional[str]
+    seeds_csv: Optional[str],
+    bit_generator: Optional[str] = None,
+    seed_strategy: Optional[str] = None,
     ) -> Params:
     """Zastosuj ewentualne nadpisania z linii poleceń do obiektu Params."""
+    overrides = (
+        pop, pc, pm, elitism, max_generations, runs, subset_mode, subset_size, subset_seed,
+        selection_type, selection_k, crossover, mutation, constraint_mode, lambda_,
+        early_patience, early_delta, bit_generator, seed_strategy,
+    )
+    if all(v is None for v in overrides) and not seeds_csv:
+        return params       # brak nadpisań - nie ma czego ponownie walidować
+
     data = params.model_dump(by_alias=True)
 
     if pop is not None:
@@ -105,6 +125,11 @@ def _merge_overrides(
     if subset_seed is not None:
         data["subset"]["seed"] = subset_seed
 
+    if bit_generator is not None:
+        data["bit_generator"] = bit_generator
+    if seed_strategy is not None:
+        data["seed_strategy"] = seed_strategy
+
     if seeds_csv:
         seeds = [int(s) for s in seeds_csv.split(",") if s.strip()]
         if seeds:
@@ -162,24 +187,28 @@ def run_ga(
 
     # Seeds lista
     seeds_csv: Optional[str] = typer.Option(None, help='Nadpisz seeds: np. "0,1,2,3"'),
+    bit_generator: Optional[str] = typer.Option(None, help='bit_generator: "pcg64" | "pcg64dxsm" | "sfc64"'),
+    seed_strategy: Optional[str] = typer.Option(None, help='seed_strategy: "list" (seeds[r]) | "spawn" (SeedSequence(seeds[0]).spawn)'),
 
     # Walidacja bez uruchamiania
     dry_run: bool = typer.Option(False, help="Tylko wczytaj i zweryfikuj config/instancje - nie uruchamiaj GA"),
     time_limit: float = typer.Option(0.0, help="Limit czasu w sekundach (0 = brak limitu)"),
     log_every: int = typer.Option(20, help="Wypisuj postęp co N generacji (0 = brak)"),
+    trusted: bool = typer.Option(False, help="Wczytuj instancje bez walidacji (tylko zaufane pliki z własnego generatora)"),
+    workers: int = typer.Option(1, help="Procesy dla runów jednej instancji (1 = sekwencyjnie z logami, 0 = liczba rdzeni)"),
 ):
     """Główna komenda: przygotuj parametry, wczytaj instancje i odpal eksperymenty."""
-    # 1) Wczytaj config i zwaliduj
-    cfg_dict = read_json(config)
-    params = Params.model_validate(cfg_dict)
-
-    # 2) Zastosuj ewentualne nadpisania z CLI
-    params = _merge_overrides(
-        params, pop, pc, pm, elitism, max_generations, runs,
-        subset_mode, subset_size, subset_seed, selection_type, selection_k,
-        crossover, mutation, constraint_mode, lambda_,
-        early_patience, early_delta, seeds_csv
+    # 1-2) Wczytaj config, zwaliduj i zastosuj ewentualne nadpisania z CLI
+    overrides = dict(
+        pop=pop, pc=pc, pm=pm, elitism=elitism, max_generations=max_generations, runs=runs,
+        subset_mode=subset_mode, subset_size=subset_size, subset_seed=subset_seed,
+        selection_type=selection_type, selection_k=selection_k,
+        crossover=crossover, mutation=mutation, constraint_mode=constraint_mode, lambda_=lambda_,
+        early_patience=early_patience, early_delta=early_delta, seeds_csv=seeds_csv,
+        bit_generator=bit_generator, seed_strategy=seed_strategy,
     )
+    params = Params.model_validate(read_json(config))
+    params = _merge_overrides(params, **overrides)
 
     print("[bold]Konfiguracja końcowa (parsowana i zwalidowana):[/bold]")       # type: ignore
     print(params.model_dump(mode="json", by_alias=True))                        # type: ignore
@@ -187,7 +216,7 @@ def run_ga(
     # 3) Oblicz ile instancji wczytamy (bez ładowania wszystkich do pamięci na raz)
     count = 0
     first_meta = None
-    for inst in iter_instances(instance):
+    for inst in iter_instances(instance, raw=True, trusted=trusted):
         inst2 = apply_subset(inst, params.subset)
         count += 1
         if first_meta is None:
@@ -210,7 +239,7 @@ def run_ga(
         raise typer.Exit(code=1)
 
     # 5) Wywołanie: runner sam strumieniuje instancje i dopisuje do pliku wynikowego
-    run_experiment(instance_path=instance, params=params, out_path=out, time_limit_sec=time_limit, log_every=log_every)
+    run_experiment(instance_path=instance, params=params, out_path=out, time_limit_sec=time_limit, log_every=log_every, workers=workers, trusted=trusted)
     print(f"[bold white][KONIEC][/bold white] [bold green]Zakończono. Wyniki w:[/bold green] {out}")                                  # type: ignore
     
     
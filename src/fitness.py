@@ -16,35 +16,91 @@ Jak łączy się z innymi plikami:
   - szybko policzyć fitness populacji,
   - ewentualnie naprawić osobniki (tryb repair),
   - sprawdzać czy rozwiązanie jest feasible (waga <= capacity).
-- `runner.py` buduje dane wejściowe do obliczeń:
-  - wektory `weights` i `values` na podstawie `Instance.items`,
+- `runner.py` buduje dane wejściowe do obliczeń raz na instancję (`build_instance_arrays`):
+  - wektory `weights` i `values` z `Instance`/`InstanceRaw` (+ tablice LUT i kolejność naprawy),
   - przekazuje je do funkcji fitnessu, aby uniknąć ciągłego dostępu do obiektów.
 
 Założenia / konwencje:
 - Chromosom = wektor bitów {0,1} o długości n (n = liczba przedmiotów).
-- Wagi i wartości przechowujemy jako `np.ndarray` float (szybko i prosto).
+- Wagi i wartości przechowujemy jako `np.ndarray`: int32 dla instancji całkowitoliczbowych
+  (dokładnie i o połowę mniej bajtów), w pozostałych przypadkach float64.
+- Sumy wag/wartości populacji liczymy na *spakowanych* bitach (8 genów na bajt)
+  z tablicami LUT budowanymi raz na instancję (`build_byte_lut`), zamiast
+  mnożyć macierz (P,n) int8 przez wektor float.
+- Jeśli zainstalowana jest Numba, tryb penalty liczony jest jednym skompilowanym
+  przebiegiem po populacji (`_fuse_penalty`); bez Numby działa ścieżka NumPy.
 - Funkcje są „czyste” (nie robią I/O). Jedyne „losowe” rzeczy są w GA,
   a nie w fitnessie.
 """
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 
 import numpy as np
+try:
+  from numba import njit, prange   # type: ignore
+  _HAS_NUMBA = True
+except Exception:   # pragma: no cover
+  _HAS_NUMBA = False
 
-from .model import Instance
+from .model import Instance, InstanceRaw
 
 
 # --- Pomocnicze: przygotowanie danych -------------------------------------------------------------------
-def build_item_arrays(instance: Instance) -> Tuple[np.ndarray, np.ndarray]:
-  """Zbuduj wektory weights/values (długości n) z obiektu Instance"""
-  w = np.array([it.weight for it in instance.items], dtype=np.float64)
-  v = np.array([it.value for it in instance.items], dtype=np.float64)
+def _fits_int32(arr: np.ndarray) -> bool:
+  """Czy wszystkie wartości są całkowite, a suma całego wektora mieści się w int32"""
+  return bool(np.all(arr == np.floor(arr))) and float(np.abs(arr).sum()) <= np.iinfo(np.int32).max
+
+
+def build_item_arrays(instance: Union[Instance, InstanceRaw]) -> Tuple[np.ndarray, np.ndarray]:
+  """
+  Weź wektory weights/values (długości n) z instancji - `Instance` liczy je raz przy walidacji,
+  `InstanceRaw` ma je od razu, więc nic tu nie przepisujemy z listy `items`.
+  
+  Jeśli wszystkie wagi i wartości są całkowite (a suma dowolnego podzbioru mieści się
+  w int32), zwracamy int32 - sumy są dokładne, a wektory o połowę mniejsze.
+  Wartości ułamkowe zostają w float64: float32 gubiłby precyzję przy sprawdzaniu
+  `w_sum <= capacity` dla dużych instancji.
+  """
+  w, v = instance.weights, instance.values
+  if _fits_int32(w) and _fits_int32(v):
+    return w.astype(np.int32), v.astype(np.int32)
   return w, v
 
 
 
+# --- Spakowane bity: tablice LUT dla wag / wartości ----------------------------------------------------
+# Wiersz b = bity bajtu b w kolejności `np.packbits` (najstarszy bit = pierwszy gen)
+_BYTE_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).astype(np.float64)   # (256, 8)
+
+
+def pack_population(pop: np.ndarray) -> np.ndarray:
+  """Spakuj populację 0/1: (P,n) int8 -> (P, ceil(n/8)) uint8 (8 genów na bajt)"""
+  return np.packbits(pop, axis=1)
+
+
+def build_byte_lut(arr: np.ndarray) -> np.ndarray:
+  """
+  Zbuduj tablicę LUT (ceil(n/8), 256) dla wektora wag lub wartości.
+  
+  lut[b, x] = suma arr[8*b + j] po wszystkich bitach j ustawionych w bajcie x,
+  więc suma dla osobnika to suma lut[b, packed[b]] po wszystkich bajtach b.
+  """
+  n = arr.shape[0]
+  n_bytes = (n + 7) // 8
+  padded = np.zeros(n_bytes * 8, dtype=np.float64)
+  padded[:n] = arr
+  return padded.reshape(n_bytes, 8) @ _BYTE_BITS.T
+
+
+def packed_sums(packed: np.ndarray, lut: np.ndarray) -> np.ndarray:
+  """Zwróć sumy (P,) dla spakowanej populacji (P, ceil(n/8)) na podstawie LUT"""
+  offsets = np.arange(lut.shape[0], dtype=np.intp) * 256
+  return np.take(lut.ravel(), packed + offsets).sum(axis=1)
+
+
+
 # --- Suma wagi / wartości dla jednego rozwiązania -------------------------------------------------------
 def total_weight(bits: np.ndarray, weights: np.ndarray) -> float:
   """Zwróć łączną wagę rozwiązania (wektor bitów) dla zadanych weights"""
@@ -73,14 +129,51 @@ def population_values(pop: np.ndarray, values: np.ndarray) -> np.ndarray:
   return pop @ values
 
 
+def population_sums(
+  pop: np.ndarray,
+  weights: np.ndarray,
+  values: np.ndarray,
+  w_lut: Optional[np.ndarray] = None,
+  v_lut: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+  """
+  Zwróć (w_sum, v_sum) dla populacji (P,n).
+  Jeśli podano tablice LUT, populacja jest pakowana raz i obie sumy liczone są z bajtów.
+  """
+  if w_lut is None or v_lut is None:
+    return population_weights(pop, weights), population_values(pop, values)
+  packed = pack_population(pop)
+  return packed_sums(packed, w_lut), packed_sums(packed, v_lut)
+
+
 
 # --- Penalty fitness -------------------------------------------------------------------------------------
+if _HAS_NUMBA:
+  @njit(cache=True, parallel=True, fastmath=True)
+  def _fuse_penalty(pop, weights, values, capacity, lam, fit, w_sum, v_sum):   # pragma: no cover
+    """Jeden przebieg po populacji: w_sum, v_sum i fitness (penalty) naraz"""
+    P, n = pop.shape
+    for i in prange(P):
+      wacc = 0.0
+      vacc = 0.0
+      for j in range(n):
+        b = pop[i, j]
+        wacc += b * weights[j]
+        vacc += b * values[j]
+      w_sum[i] = wacc
+      v_sum[i] = vacc
+      over = wacc - capacity
+      fit[i] = vacc - lam * (over if over > 0.0 else 0.0)
+
+
 def fitness_penalty(
   pop: np.ndarray,
   weights: np.ndarray,
   values: np.ndarray,
   capacity: float,
   lambda_: float,
+  w_lut: Optional[np.ndarray] = None,
+  v_lut: Optional[np.ndarray] = None,
 ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
   """
   Policz fitness całej populacji w trybie penalty.
@@ -90,8 +183,15 @@ def fitness_penalty(
    - w_sum:   (P,)
    - v_sum:   (P,)
   """
-  w_sum = population_weights(pop, weights)
-  v_sum = population_values(pop, values)
+  if _HAS_NUMBA:
+    P = pop.shape[0]
+    fit = np.empty(P, dtype=np.float64)
+    w_sum = np.empty(P, dtype=np.float64)
+    v_sum = np.empty(P, dtype=np.float64)
+    _fuse_penalty(pop, weights, values, float(capacity), float(lambda_), fit, w_sum, v_sum)
+    return fit, w_sum, v_sum
+  
+  w_sum, v_sum = population_sums(pop, weights, values, w_lut, v_lut)
   
   overweight = np.maximum(0.0, w_sum - capacity)
   
@@ -101,11 +201,23 @@ def fitness_penalty(
 
 
 # --- Repair (naprawa) ----------------------------------------------------------------------------------
+def precompute_repair_order(weights: np.ndarray, values: np.ndarray) -> np.ndarray:
+  """
+  Zwróć kolejność zdejmowania przedmiotów przy naprawie (indeksy, int64).
+  
+  Rosnąco po value/weight, przy remisie rosnąco po indeksie. Kolejność zależy tylko
+  od instancji, więc liczymy ją raz na run i przekazujemy do funkcji naprawy.
+  """
+  ratio = values / np.maximum(weights, 1e-12)
+  return np.lexsort((np.arange(weights.shape[0]), ratio)).astype(np.int64)
+
+
 def repair_solution(
   bits: np.ndarray,
   weights: np.ndarray,
   values: np.ndarray,
-  capacity: float
+  capacity: float,
+  remove_order: Optional[np.ndarray] = None,
 ) -> np.ndarray:
   """
   Napraw rozwiązanie (pojedynczy chromosom) tak, aby stało się feasible.
@@ -119,6 +231,10 @@ def repair_solution(
   
   Deterministyczność:
    - przy równym value/weight sortujemy stabilnie po indeksie (rosnąco)
+  
+  Zamiast pętli po przedmiotach liczymy sumę skumulowaną zdejmowanych wag
+  (w kolejności `remove_order`) i jednym `searchsorted` znajdujemy miejsce,
+  w którym nadwaga zostaje zniesiona.
   """
   x = bits.copy()
   
@@ -126,21 +242,14 @@ def repair_solution(
   if current_w <= capacity:
     return x
   
-  chosen_idx = np.flatnonzero(x == 1)
-  if chosen_idx.size == 0:
-     return x
-   
-  ratio = values[chosen_idx] / np.maximum(weights[chosen_idx], 1e-12)
-  
-  order = np.lexsort((chosen_idx, ratio))
-  remove_seq = chosen_idx[order]
-  
-  for j in remove_seq:
-    if current_w <= capacity:
-      break
-    x[j] = 0
-    current_w -= float(weights[j])
-    
+  if remove_order is None:
+    remove_order = precompute_repair_order(weights, values)
+  
+  taken = x[remove_order] != 0
+  cum = np.cumsum(weights[remove_order] * taken)
+  k = int(np.searchsorted(cum, current_w - capacity))
+  
+  x[remove_order[:k + 1][taken[:k + 1]]] = 0
   return x
 
 
@@ -148,11 +257,17 @@ def repair_population(
   pop: np.ndarray,
   weights: np.ndarray,
   values: np.ndarray,
-  capacity: float
+  capacity: float,
+  w_lut: Optional[np.ndarray] = None,
+  v_lut: Optional[np.ndarray] = None,
+  remove_order: Optional[np.ndarray] = None,
 ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
   """
   Napraw całą populację (P, n) w trybie repair.
   
+  Wszystkie osobniki z nadwagą naprawiamy naraz (ta sama strategia co w `repair_solution`):
+  sumy skumulowane po wierszach i jedna maska zdejmowanych genów.
+  
   Zwraca:
    - pop_fixed (P, n)
    - w_sum     (P,)
@@ -160,16 +275,61 @@ def repair_population(
   """
   pop_fixed = pop.copy()
   
-  w_sum = population_weights(pop_fixed, weights)
+  w_sum, v_sum = population_sums(pop_fixed, weights, values, w_lut, v_lut)
   overweight_idx = np.flatnonzero(w_sum > capacity)
+  if overweight_idx.size == 0:
+    return pop_fixed, w_sum, v_sum
+  
+  if remove_order is None:
+    remove_order = precompute_repair_order(weights, values)
+  
+  # wiersze z nadwagą, geny w kolejności zdejmowania
+  rows = pop_fixed[np.ix_(overweight_idx, remove_order)]
+  cum = np.cumsum(rows * weights[remove_order], axis=1)
+  excess = w_sum[overweight_idx] - capacity
+  
+  # k = pierwsza pozycja, w której cum >= excess (jak searchsorted, ale dla każdego wiersza)
+  k = (cum < excess[:, None]).sum(axis=1)
+  rows &= np.arange(rows.shape[1])[None, :] > k[:, None]
+  pop_fixed[np.ix_(overweight_idx, remove_order)] = rows
+  
+  # przeliczamy sumy tylko dla naprawionych osobników
+  w_sum[overweight_idx], v_sum[overweight_idx] = population_sums(
+    pop_fixed[overweight_idx], weights, values, w_lut, v_lut
+  )
   
-  for i in overweight_idx:
-    pop_fixed[i] = repair_solution(pop_fixed[i], weights, values, capacity)
-    
-  w_sum2 = population_weights(pop_fixed, weights)
-  v_sum2 = population_values(pop_fixed, values)
+  return pop_fixed, w_sum, v_sum
+
+
+
+# --- Dane instancji przygotowane raz ------------------------------------------------------------------------
+@dataclass(frozen=True)
+class InstanceArrays:
+  """Wszystko, czego fitness potrzebuje z instancji - budowane raz i współdzielone przez runy"""
+  weights: np.ndarray
+  values: np.ndarray
+  capacity: float
+  w_lut: np.ndarray
+  v_lut: np.ndarray
+  remove_order: np.ndarray
   
-  return pop_fixed, w_sum2, v_sum2
+  @property
+  def n_items(self) -> int:
+    """Zwraca liczbę przedmiotów"""
+    return int(self.weights.shape[0])
+
+
+def build_instance_arrays(instance: Union[Instance, InstanceRaw]) -> InstanceArrays:
+  """Zbuduj `InstanceArrays` (wektory, tablice LUT, kolejność naprawy) z obiektu Instance"""
+  weights, values = build_item_arrays(instance)
+  return InstanceArrays(
+    weights=weights,
+    values=values,
+    capacity=float(instance.capacity),
+    w_lut=build_byte_lut(weights),
+    v_lut=build_byte_lut(values),
+    remove_order=precompute_repair_order(weights, values),
+  )
 
 
 
@@ -181,6 +341,9 @@ def evaluate_population(
   capacity: float,
   constraint_mode: str,
   lambda_: float,
+  w_lut: Optional[np.ndarray] = None,
+  v_lut: Optional[np.ndarray] = None,
+  remove_order: Optional[np.ndarray] = None,
 ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
   """
   Główna funkcja "evaluate" dla GA.
@@ -195,13 +358,17 @@ def evaluate_population(
    - W trybie repair fitness = v_sum (bo wszystkie powinny być feasible),
      a jeśli coś nie da się naprawić (teoretycznie), to nadal fitness = v_sum,
      ale wagi pokażą czy jest feasible
+   - `w_lut`/`v_lut` (z `build_byte_lut`) są opcjonalne; bez nich sumy liczone są
+     klasycznie przez `pop @ weights`
+   - `remove_order` (z `precompute_repair_order`) warto policzyć raz na run;
+     bez niego kolejność naprawy jest liczona przy każdym wywołaniu
   """
   if constraint_mode == "penalty":
-    fit, w_sum, v_sum = fitness_penalty(pop, weights, values, capacity, lambda_)
+    fit, w_sum, v_sum = fitness_penalty(pop, weights, values, capacity, lambda_, w_lut, v_lut)
     return pop, fit, w_sum, v_sum
   
   if constraint_mode == "repair":
-    pop_fixed, w_sum, v_sum = repair_population(pop, weights, values, capacity)
+    pop_fixed, w_sum, v_sum = repair_population(pop, weights, values, capacity, w_lut, v_lut, remove_order)
     fit = v_sum
     return pop_fixed, fit, w_sum, v_sum
   
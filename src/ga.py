@@ -11,6 +11,17 @@ Ten moduł implementuje „silnik” algorytmu genetycznego dla problemu plecako
 - mutacja bit-flip z prawdopodobieństwem pm,
 - elityzm (przeniesienie najlepszych osobników do następnego pokolenia).
 
+Operatory występują w dwóch wariantach: dla pojedynczej pary/osobnika
+(`select_parent`, `crossover`, `mutate`) oraz wsadowo dla całego pokolenia
+(`select_parents`, `crossover_batch`, `mutate_batch`). `next_generation` używa
+wariantów wsadowych - kilka wywołań NumPy na pokolenie zamiast ~3P.
+
+`next_generation_evaluated` łączy budowę pokolenia z liczeniem fitnessu. Z Numbą
+wszystkie losowania robimy jak wyżej (NumPy, ta sama kolejność), a krzyżowanie,
+mutację, naprawę i fitness wykonuje jeden skompilowany przebieg po populacji
+(`_fused_generation`, razem z rozstrzyganiem turniejów) - populacja jest taka sama jak z `next_generation` + `evaluate_population`
+(sumy wag/wartości mogą różnić się zaokrągleniem float, więc przy remisach przebiegi mogą się rozejść).
+
 Jak łączy się z resztą:
 - `fitness.py` dostarcza funkcję `evaluate_population(...)`, która zwraca fitness,
   oraz (w trybie repair) może zmodyfikować populację, aby była feasible.
@@ -26,14 +37,43 @@ Założenia:
 """
 from __future__ import annotations
 
-from typing import Tuple
+from typing import Optional, Tuple, Union
 
 import numpy as np
+try:
+  from numba import njit, prange   # type: ignore
+  _HAS_NUMBA = True
+except Exception:   # pragma: no cover
+  _HAS_NUMBA = False
 
+from .fitness import InstanceArrays, evaluate_population
 from .model import Params
 
 
 
+# --- RNG ------------------------------------------------------------------------------------------------
+_BIT_GENERATORS = {
+  "pcg64": np.random.PCG64,
+  "pcg64dxsm": np.random.PCG64DXSM,
+  "sfc64": np.random.SFC64,
+}
+
+
+def make_rng(seed: Union[int, np.random.SeedSequence], bit_generator: str = "pcg64") -> np.random.Generator:
+  """
+  Zbuduj deterministyczny `Generator` dla runu z wybranym generatorem bitów.
+  "pcg64" daje ten sam strumień co `np.random.default_rng(seed)`; "sfc64" jest
+  szybszy przy masowym losowaniu (operatory GA są zdominowane przez RNG).
+  `seed` może być też potomnym `SeedSequence` (z `SeedSequence.spawn`).
+  """
+  try:
+    bg = _BIT_GENERATORS[bit_generator]
+  except KeyError:
+    raise ValueError(f"Nieznany generator bitów: {bit_generator}") from None
+  return np.random.Generator(bg(seed))
+
+
+
 # --- Parametry mutacji ----------------------------------------------------------------------------------
 def resolve_pm(pm: str | float, n_items: int) -> float:
   """Zamień pm z configu na liczbę float (np. `1/n` -> 1/n)"""
@@ -45,14 +85,29 @@ def resolve_pm(pm: str | float, n_items: int) -> float:
 
 
 
+# --- Losowe bity ----------------------------------------------------------------------------------------
+def random_bits(rows: int, n: int, rng: np.random.Generator) -> np.ndarray:
+  """
+  Zwróć macierz (rows, n) niezależnych bitów ~Bernoulli(0.5) jako uint8 0/1.
+  
+  Bity pochodzą ze spakowanych surowych słów uint64 generatora (64 bity na jedno
+  losowanie) i są rozpakowywane dopiero tutaj - zamiast losować każdy bit osobno.
+  """
+  n_bytes = (n + 7) // 8
+  n_words = (rows * n_bytes + 7) // 8
+  raw = rng.bit_generator.random_raw(n_words).astype("<u8", copy=False)
+  packed = raw.view(np.uint8)[:rows * n_bytes].reshape(rows, n_bytes)
+  return np.unpackbits(packed, axis=1, count=n)
+
+
+
 # --- Inicjalizacja populacji ----------------------------------------------------------------------------
 def init_population(pop_size: int, n_items: int, rng: np.random.Generator) -> np.ndarray:
   """
   Stwórz populację startową (P, n) jako 0/1 (np.int8)
-  Uwaga: startowo losujemy niezależnie bity ~Bernoulli(0.5)
+  Uwaga: startowo losujemy niezależnie bity ~Bernoulli(0.5) (patrz `random_bits`)
   """
-  pop = rng.integers(0, 2, size=(pop_size, n_items), dtype=np.int8)
-  return pop
+  return random_bits(pop_size, n_items, rng).view(np.int8)
 
 
 
@@ -63,29 +118,57 @@ def tournament_select(fitness: np.ndarray, k: int, rng: np.random.Generator) ->
    - losujemy k kandydatów
    - wybieramy tego o największym fitness
   """
-  idx = rng.integers(0, fitness.shape[0], size=k)
-  
-  best = idx[np.argmax(fitness[idx])]
-  return int(best)
+  return int(tournament_select_batch(fitness, k, 1, rng)[0])
 
 
-def roulette_select(fitness: np.ndarray, rng: np.random.Generator) -> int:
+def _draw_tournament_candidates(n_pop: int, k: int, m: int, rng: np.random.Generator) -> np.ndarray:
   """
-  Wybierz indeks jednego rodzica metodą ruletki.
+  Macierz kandydatów (m, k) int64 dla `m` turniejów - jedno wywołanie RNG.
+  Wspólna dla `tournament_select_batch` i `next_generation_evaluated` (te same losowania).
+  """
+  return rng.integers(0, n_pop, size=(m, k), dtype=np.int64)
+
+
+def tournament_select_batch(fitness: np.ndarray, k: int, m: int, rng: np.random.Generator) -> np.ndarray:
+  """
+  Wybierz indeksy `m` rodziców metodą turniejową - wszystkie turnieje naraz (int64, (m,)).
+   - losujemy macierz kandydatów (m, k) jednym wywołaniem RNG
+   - w każdym wierszu wygrywa kandydat o największym fitness (przy remisie - pierwszy)
+  Zamiast m małych tablic mamy jeden odczyt fitness[idx] i jeden argmax po osi.
+  """
+  idx = _draw_tournament_candidates(fitness.shape[0], k, m, rng)
+  winner = np.argmax(fitness[idx], axis=1)
+  return np.take_along_axis(idx, winner[:, None], axis=1)[:, 0]
+
+
+def build_roulette_cdf(fitness: np.ndarray) -> np.ndarray:
+  """
+  Zbuduj dystrybuantę (sumy skumulowane) dla ruletki - raz na pokolenie.
   Uwaga: ruletka wymaga nieujemnych wag - dlatego przesuwamy fitness do >= 0
   """
-  f = fitness.astype(np.float64)
+  cdf = fitness.astype(np.float64)      # jedyna alokacja - dalej wszystko w miejscu
   
-  min_f = float(np.min(f))
+  min_f = float(np.min(cdf))
   if min_f < 0:
-    f = f - min_f
+    cdf -= min_f
   
-  total = float(np.sum(f))
+  return np.cumsum(cdf, out=cdf)
+
+
+def roulette_select(fitness: np.ndarray, rng: np.random.Generator, cdf: Optional[np.ndarray] = None) -> int:
+  """
+  Wybierz indeks jednego rodzica metodą ruletki.
+  Przy wielu losowaniach z tej samej populacji przekaż `cdf` z `build_roulette_cdf`.
+  """
+  if cdf is None:
+    cdf = build_roulette_cdf(fitness)
+  
+  total = float(cdf[-1])
   if total <= 0:
     return int(rng.integers(0, fitness.shape[0]))
   
-  probs = f / total
-  return int(rng.choice(fitness.shape[0], p=probs))
+  i = int(np.searchsorted(cdf, rng.random() * total, side="right"))
+  return min(i, fitness.shape[0] - 1)
 
 
 def select_parent(fitness: np.ndarray, params: Params, rng: np.random.Generator) -> int:
@@ -97,62 +180,210 @@ def select_parent(fitness: np.ndarray, params: Params, rng: np.random.Generator)
   raise ValueError(f"Nieznany typ selekcji: {params.selection.type}")
 
 
+def roulette_select_batch(fitness: np.ndarray, m: int, rng: np.random.Generator) -> np.ndarray:
+  """
+  Wybierz indeksy `m` rodziców metodą ruletki.
+  Dystrybuanta liczona jest raz, a każde losowanie to wyszukiwanie binarne - O(P + m log P).
+  """
+  cdf = build_roulette_cdf(fitness)
+  
+  total = float(cdf[-1])
+  if total <= 0:
+    return rng.integers(0, fitness.shape[0], size=m)
+  
+  u = rng.random(m)
+  u *= total
+  idx = np.searchsorted(cdf, u, side="right")
+  return np.minimum(idx, fitness.shape[0] - 1, out=idx)
+
+
+def select_parents(fitness: np.ndarray, params: Params, m: int, rng: np.random.Generator) -> np.ndarray:
+  """Wybierz indeksy `m` rodziców zgodnie z konfiguracją selekcji"""
+  if params.selection.type == "tournament":
+    return tournament_select_batch(fitness, params.selection.k, m, rng)
+  if params.selection.type == "roulette":
+    return roulette_select_batch(fitness, m, rng)
+  raise ValueError(f"Nieznany typ selekcji: {params.selection.type}")
+
+
 
 # --- Krzyżowanie -----------------------------------------------------------------------------------------
-def crossover_one_point(p1: np.ndarray, p2: np.ndarray, pc: float, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+def crossover_one_point(
+  p1: np.ndarray,
+  p2: np.ndarray,
+  pc: float,
+  rng: np.random.Generator,
+  out1: Optional[np.ndarray] = None,
+  out2: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
   """
   Krzyżowanie jednopunktowe:
    - z prawdopodobieństwem pc robimy crossover
    - w przeciwnym razie kopiujemy rodziców
+  Dzieci zapisujemy do `out1`/`out2` (np. wiersze `new_pop[i]`, `new_pop[i+1]`),
+  a gdy ich nie podano - do nowych wektorów.
   """
   n = p1.shape[0]
+  if out1 is None:
+    out1 = np.empty(n, dtype=np.int8)
+  if out2 is None:
+    out2 = np.empty(n, dtype=np.int8)
+  
   if n < 2 or rng.random() >= pc:
-    return p1.copy(), p2.copy()
+    out1[:] = p1
+    out2[:] = p2
+    return out1, out2
   
   cut = int(rng.integers(1, n))
-  c1 = np.concatenate([p1[:cut], p2[cut:]]).astype(np.int8, copy=False)
-  c2 = np.concatenate([p2[:cut], p1[cut:]]).astype(np.int8, copy=False)
-  return c1, c2
+  out1[:cut] = p1[:cut]
+  out1[cut:] = p2[cut:]
+  out2[:cut] = p2[:cut]
+  out2[cut:] = p1[cut:]
+  return out1, out2
 
 
 def crossover_uniform(
-    p1: np.ndarray, p2: np.ndarray, pc: float, rng: np.random.Generator
+    p1: np.ndarray,
+    p2: np.ndarray,
+    pc: float,
+    rng: np.random.Generator,
+    out1: Optional[np.ndarray] = None,
+    out2: Optional[np.ndarray] = None,
 ) -> Tuple[np.ndarray, np.ndarray]:
     """
     Krzyżowanie uniform:
     - z prawdopodobieństwem pc mieszamy geny maską losową,
     - w przeciwnym razie kopiujemy rodziców.
+    Dzieci zapisujemy do `out1`/`out2` (jak w `crossover_one_point`).
     """
     n = p1.shape[0]
+    if out1 is None:
+        out1 = np.empty(n, dtype=np.int8)
+    if out2 is None:
+        out2 = np.empty(n, dtype=np.int8)
+
     if rng.random() >= pc:
-        return p1.copy(), p2.copy()
+        out1[:] = p1
+        out2[:] = p2
+        return out1, out2
 
-    mask = rng.integers(0, 2, size=n, dtype=np.int8)  # 0/1 maska
-    c1 = np.where(mask == 1, p1, p2).astype(np.int8)
-    c2 = np.where(mask == 1, p2, p1).astype(np.int8)
-    return c1, c2
+    mask = random_bits(1, n, rng)[0].view(bool)  # 0/1 maska
+    np.copyto(out1, p2)
+    np.copyto(out1, p1, where=mask)
+    np.copyto(out2, p1)
+    np.copyto(out2, p2, where=mask)
+    return out1, out2
 
 
-def crossover(p1: np.ndarray, p2: np.ndarray, params: Params, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+def crossover(
+    p1: np.ndarray,
+    p2: np.ndarray,
+    params: Params,
+    rng: np.random.Generator,
+    out1: Optional[np.ndarray] = None,
+    out2: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
     """Wybierz operator krzyżowania zgodnie z params.crossover."""
     if params.crossover == "one_point":
-        return crossover_one_point(p1, p2, params.pc, rng)
+        return crossover_one_point(p1, p2, params.pc, rng, out1, out2)
+    if params.crossover == "uniform":
+        return crossover_uniform(p1, p2, params.pc, rng, out1, out2)
+    raise ValueError(f"Nieznany operator crossover: {params.crossover}")
+
+
+def _draw_crossover(
+    K: int, n: int, params: Params, rng: np.random.Generator
+) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    Losowania krzyżowania wsadowego dla K par: (do_cross (K,), cuts (K,) | None, bits (K, n) | None).
+    - one_point: punkty cięcia `cuts` (brak dla n < 2 - wtedy kopiujemy rodziców),
+    - uniform: losowe bity `bits` (1 = gen dziecka 1 z p1).
+    """
+    do_cross = rng.random(K) < params.pc
+    if params.crossover == "one_point":
+        cuts = rng.integers(1, n, size=K) if n >= 2 else None
+        return do_cross, cuts, None
     if params.crossover == "uniform":
-        return crossover_uniform(p1, p2, params.pc, rng)
+        return do_cross, None, random_bits(K, n, rng)
     raise ValueError(f"Nieznany operator crossover: {params.crossover}")
 
 
+def crossover_batch(
+    p1: np.ndarray,
+    p2: np.ndarray,
+    params: Params,
+    rng: np.random.Generator,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Krzyżowanie wsadowe dla wszystkich par naraz.
+    - p1, p2: (K, n) rodzice kolejnych par,
+    - zwraca (2K, n): dzieci pary j w wierszach 2j i 2j+1,
+    - `out` (np. `new_pop[e:]`) może mieć 2K albo 2K-1 wierszy - wtedy drugie dziecko
+      ostatniej pary jest pomijane; dzieci zapisujemy bez tablic pośrednich.
+
+    Budujemy jedną maskę (K, n) "gen dziecka 1 pochodzi z p1":
+    - one_point: geny przed punktem cięcia,
+    - uniform: losowa maska 0/1,
+    - pary bez krzyżowania (prawdopodobieństwo 1-pc) mają maskę samych jedynek (kopia rodziców).
+    """
+    K, n = p1.shape
+    if out is None:
+        out = np.empty((2 * K, n), dtype=np.int8)
+    do_cross, cuts, bits = _draw_crossover(K, n, params, rng)
+
+    if bits is not None:
+        mask = bits.view(bool)
+    elif cuts is not None:
+        mask = np.arange(n)[None, :] < cuts[:, None]
+    else:
+        mask = np.ones((K, n), dtype=bool)
+    mask[~do_cross] = True
+
+    c1 = out[0::2]
+    np.copyto(c1, p2)
+    np.copyto(c1, p1, where=mask)
+
+    k2 = out.shape[0] // 2
+    c2 = out[1::2]
+    np.copyto(c2, p1[:k2])
+    np.copyto(c2, p2[:k2], where=mask[:k2])
+    return out
+
+
 
 # --- Mutacja -------------------------------------------------------------------------------------------------
+# Poniżej tego oczekiwanego ułamka mutacji na osobnika (pm * n) losujemy tylko pozycje mutacji
+SPARSE_MUTATION_MAX_FLIPS = 1.5
+
+
+def _sparse_flip_positions(n_genes: int, pm: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Wylosuj pozycje mutacji wśród `n_genes` genów bez losowania każdego genu osobno:
+    liczba mutacji k ~ Binomial(n_genes, pm), a potem k różnych pozycji bez powtórzeń.
+    Rozkład jest dokładnie taki sam jak przy niezależnym losowaniu każdego genu z pm.
+    """
+    k = int(rng.binomial(n_genes, pm))
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+    return rng.choice(n_genes, size=k, replace=False)
+
+
 def mutate_bitflip(child: np.ndarray, pm: float, rng: np.random.Generator) -> np.ndarray:
     """
     Mutacja bit-flip:
     - dla każdego genu z prawdopodobieństwem pm odwracamy 0<->1.
+    - przy małym pm (np. 1/n) losujemy tylko pozycje mutacji (patrz `_sparse_flip_positions`).
     """
+    n = child.shape[0]
+    if pm * n < SPARSE_MUTATION_MAX_FLIPS:
+        child[_sparse_flip_positions(n, pm, rng)] ^= 1
+        return child
 
-    m = rng.random(child.shape[0]) < pm
+    m = rng.random(n) < pm
 
-    child[m] = (1 - child[m]).astype(np.int8, copy=False)
+    # XOR z maską bool w miejscu - zostajemy w int8, bez tymczasowego int64
+    child ^= m
     return child
 
 
@@ -163,15 +394,55 @@ def mutate(child: np.ndarray, params: Params, pm_value: float, rng: np.random.Ge
     raise ValueError(f"Nieznany operator mutacji: {params.mutation}")
 
 
+def _draw_flips(rows: int, n: int, pm: float, rng: np.random.Generator) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    Losowania mutacji bit-flip dla macierzy (rows, n) - wspólne dla `mutate_bitflip_batch`
+    i `next_generation_evaluated`. Zwraca (pozycje, None) - płaskie indeksy mutacji
+    (rzadka ścieżka, patrz `_sparse_flip_positions`) albo (None, maska (rows, n)).
+    """
+    if pm * n < SPARSE_MUTATION_MAX_FLIPS:
+        return _sparse_flip_positions(rows * n, pm, rng), None
+    return None, rng.random((rows, n)) < pm
+
+
+def mutate_bitflip_batch(children: np.ndarray, pm: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Mutacja bit-flip dla całej macierzy dzieci (K, n) - jedno losowanie i XOR w miejscu.
+    Przy małym pm losujemy tylko pozycje mutacji w całej macierzy (O(liczba mutacji) zamiast O(K*n)).
+    """
+    K, n = children.shape
+    flip_pos, flip_mask = _draw_flips(K, n, pm, rng)
+    if flip_mask is not None:
+        children ^= flip_mask
+        return children
+
+    rows, cols = np.divmod(flip_pos, n)
+    children[rows, cols] ^= 1
+    return children
+
+
+def mutate_batch(children: np.ndarray, params: Params, pm_value: float, rng: np.random.Generator) -> np.ndarray:
+    """Wybierz wsadowy operator mutacji zgodnie z params.mutation."""
+    if params.mutation == "bit_flip":
+        return mutate_bitflip_batch(children, pm_value, rng)
+    raise ValueError(f"Nieznany operator mutacji: {params.mutation}")
+
+
 
 # --- Elityzm --------------------------------------------------------------------------------------------------
 def get_elite_indices(fitness: np.ndarray, elitism: int) -> np.ndarray:
-    """Zwróć indeksy elit (najlepszych osobników) - największy fitness."""
+    """
+    Zwróć indeksy elit (najlepszych osobników) - największy fitness.
+    Kolejność elit między sobą jest dowolna - wystarczy częściowe uporządkowanie (O(P) zamiast sortowania).
+    """
     if elitism <= 0:
         return np.array([], dtype=np.int64)
-    # argsort rosnąco, więc bierzemy ogon
-    idx = np.argsort(fitness)[-elitism:]
-    return idx.astype(np.int64)
+    P = fitness.shape[0]
+    if elitism >= P:
+        return np.arange(P, dtype=np.int64)
+    # argpartition: na ostatnich `elitism` pozycjach lądują największe wartości
+    idx = np.argpartition(fitness, P - elitism)[P - elitism:]
+    return idx.astype(np.int64, copy=False)
 
 
 # --- Jedna generacja -------------------------------------------------------------------------------------------
@@ -181,13 +452,16 @@ def next_generation(
     fitness: np.ndarray,
     params: Params,
     rng: np.random.Generator,
+    pm_value: Optional[float] = None,
 ) -> np.ndarray:
     """
     Zbuduj następne pokolenie.
     Uwaga: tu nie liczymy fitnessu (to robi `fitness.evaluate_population`).
+    `pm_value` - gotowe pm (z `resolve_pm`), liczone raz na run; None = wyznacz tutaj.
     """
     P, n = pop.shape
-    pm_value = resolve_pm(params.pm, n)
+    if pm_value is None:
+        pm_value = resolve_pm(params.pm, n)
 
     new_pop = np.empty_like(pop, dtype=np.int8)
 
@@ -195,29 +469,181 @@ def next_generation(
     elite_idx = get_elite_indices(fitness, params.elitism)
     e = elite_idx.size
     if e > 0:
-        new_pop[:e] = pop[elite_idx]
-
-    # 2) Uzupełniamy resztę przez selekcję + crossover + mutację
-    i = e
-    while i < P:
-        # wybór dwóch rodziców
-        p1_idx = select_parent(fitness, params, rng)
-        p2_idx = select_parent(fitness, params, rng)
-        p1 = pop[p1_idx]
-        p2 = pop[p2_idx]
-
-        # crossover -> dwoje dzieci
-        c1, c2 = crossover(p1, p2, params, rng)
-
-        # mutacja
-        c1 = mutate(c1, params, pm_value, rng)
-        c2 = mutate(c2, params, pm_value, rng)
-
-        # zapis do populacji (uważamy na nieparzysty P)
-        new_pop[i] = c1
-        i += 1
-        if i < P:
-            new_pop[i] = c2
-            i += 1
-
-    return new_pop
\ No newline at end of file
+        np.take(pop, elite_idx, axis=0, out=new_pop[:e])     # kopia wprost do new_pop, bez tablicy pośredniej
+
+    # 2) Uzupełniamy resztę przez selekcję + crossover + mutację (wsadowo dla wszystkich par)
+    n_children = P - e
+    if n_children > 0:
+        n_pairs = (n_children + 1) // 2
+        parents = select_parents(fitness, params, 2 * n_pairs, rng)
+
+        # crossover -> dwoje dzieci na parę, zapis wprost do new_pop
+        # (przy nieparzystej liczbie dzieci drugie dziecko ostatniej pary jest pomijane)
+        children = crossover_batch(pop[parents[0::2]], pop[parents[1::2]], params, rng, out=new_pop[e:])
+
+        # mutacja (w miejscu, na widoku new_pop)
+        mutate_batch(children, params, pm_value, rng)
+
+    return new_pop
+
+
+# --- Jedna generacja + fitness (fuzja) ---------------------------------------------------------------------------
+_CONSTRAINT_IDS = {"repair": 0, "penalty": 1}
+
+if _HAS_NUMBA:
+    @njit(cache=True, inline="always")
+    def _tournament_winner(cand, row, fitness):   # pragma: no cover
+        """Zwycięzca wiersza kandydatów: największy fitness, przy remisie pierwszy (jak np.argmax)"""
+        best = cand[row, 0]
+        for t in range(1, cand.shape[1]):
+            c = cand[row, t]
+            if fitness[c] > fitness[best]:
+                best = c
+        return best
+
+    @njit(cache=True, parallel=True)
+    def _fused_generation(
+        pop, fitness, w_prev, v_prev, elite_idx, parents, do_cross, cuts, bits, flip_pos, flip_start, flip_mask,
+        weights, values, capacity, mode_id, lam, remove_order, new_pop, fit, w_sum, v_sum,
+    ):   # pragma: no cover
+        """Elity + krzyżowanie + mutacja + (naprawa) + fitness w jednym przebiegu po wierszach new_pop"""
+        P, n = pop.shape
+        e = elite_idx.shape[0]
+        for i in range(e):
+            src = elite_idx[i]
+            new_pop[i, :] = pop[src, :]
+            fit[i] = fitness[src]
+            w_sum[i] = w_prev[src]
+            v_sum[i] = v_prev[src]
+
+        for r in prange(P - e):
+            j = r // 2
+            a = _tournament_winner(parents, 2 * j, fitness)
+            b = _tournament_winner(parents, 2 * j + 1, fitness)
+            if r % 2 == 1:
+                a, b = b, a
+            row = new_pop[e + r]
+
+            # krzyżowanie
+            if not do_cross[j]:
+                row[:] = pop[a, :]
+            elif bits.shape[0] > 0:
+                for g in range(n):
+                    row[g] = pop[b, g] ^ ((pop[a, g] ^ pop[b, g]) & bits[j, g])
+            elif cuts.shape[0] > 0:
+                c = cuts[j]
+                row[:c] = pop[a, :c]
+                row[c:] = pop[b, c:]
+            else:
+                row[:] = pop[a, :]
+
+            # mutacja
+            if flip_mask.shape[0] > 0:
+                for g in range(n):
+                    row[g] ^= flip_mask[r, g]
+            else:
+                for t in range(flip_start[r], flip_start[r + 1]):
+                    row[flip_pos[t] - r * n] ^= 1
+
+            # sumy wag / wartości (bez rozgałęzień - geny są 0/1)
+            wacc = 0.0
+            vacc = 0.0
+            for g in range(n):
+                wacc += weights[g] * row[g]
+                vacc += values[g] * row[g]
+
+            if mode_id == 0:
+                # naprawa: zdejmujemy w kolejności remove_order, aż waga <= capacity
+                if wacc > capacity:
+                    for t in range(n):
+                        g = remove_order[t]
+                        if row[g]:
+                            row[g] = 0
+                            wacc -= weights[g]
+                            vacc -= values[g]
+                            if wacc <= capacity:
+                                break
+                fit[e + r] = vacc
+            else:
+                over = wacc - capacity
+                fit[e + r] = vacc - lam * (over if over > 0.0 else 0.0)
+            w_sum[e + r] = wacc
+            v_sum[e + r] = vacc
+
+
+def next_generation_evaluated(
+    pop: np.ndarray,
+    fitness: np.ndarray,
+    w_sum: np.ndarray,
+    v_sum: np.ndarray,
+    params: Params,
+    rng: np.random.Generator,
+    arrays: InstanceArrays,
+    pm_value: Optional[float] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Zbuduj następne pokolenie i od razu policz jego fitness.
+
+    Zwraca (pop, fitness, w_sum, v_sum) jak `fitness.evaluate_population`. `w_sum`/`v_sum`
+    opisują bieżącą populację (elity przenoszą swoje wartości bez ponownego liczenia).
+    Bez Numby to po prostu `next_generation` + `evaluate_population`.
+    `pm_value` jak w `next_generation`.
+    """
+    mode = params.constraint.mode
+    lam = params.constraint.lambda_
+    if not _HAS_NUMBA or mode not in _CONSTRAINT_IDS or params.mutation != "bit_flip":
+        return evaluate_population(
+            pop=next_generation(pop, fitness, params, rng, pm_value),
+            weights=arrays.weights,
+            values=arrays.values,
+            capacity=arrays.capacity,
+            constraint_mode=mode,
+            lambda_=lam,
+            w_lut=arrays.w_lut,
+            v_lut=arrays.v_lut,
+            remove_order=arrays.remove_order,
+        )
+
+    P, n = pop.shape
+    if pm_value is None:
+        pm_value = resolve_pm(params.pm, n)
+
+    # losowania w tej samej kolejności co w `next_generation`
+    elite_idx = get_elite_indices(fitness, params.elitism)
+    e = elite_idx.size
+    n_children = P - e
+    n_pairs = (n_children + 1) // 2
+    if n_children > 0:
+        if params.selection.type == "tournament":
+            # te same losowania co `tournament_select_batch`; zwycięzców wybiera kernel
+            parents = _draw_tournament_candidates(P, params.selection.k, 2 * n_pairs, rng)
+        else:
+            parents = select_parents(fitness, params, 2 * n_pairs, rng).astype(np.int64, copy=False)[:, None]
+        do_cross, cuts, bits = _draw_crossover(n_pairs, n, params, rng)
+        flip_pos, flip_mask = _draw_flips(n_children, n, pm_value, rng)
+    else:
+        parents = np.empty((0, 1), dtype=np.int64)
+        do_cross, cuts, bits = np.empty(0, dtype=bool), None, None
+        flip_pos, flip_mask = None, None
+    if cuts is None:
+        cuts = np.empty(0, dtype=np.int64)
+    if bits is None:
+        bits = np.empty((0, 0), dtype=np.uint8)
+    if flip_mask is None:
+        flip_pos = np.empty(0, dtype=np.int64) if flip_pos is None else np.sort(flip_pos).astype(np.int64, copy=False)
+        flip_start = np.searchsorted(flip_pos, np.arange(n_children + 1, dtype=np.int64) * n)
+        flip_mask = np.empty((0, 0), dtype=bool)
+    else:
+        flip_pos = flip_start = np.empty(0, dtype=np.int64)
+
+    new_pop = np.empty_like(pop, dtype=np.int8)
+    fit = np.empty(P, dtype=np.float64)
+    w_new = np.empty(P, dtype=np.float64)
+    v_new = np.empty(P, dtype=np.float64)
+    _fused_generation(
+        pop, np.asarray(fitness, dtype=np.float64), np.asarray(w_sum, dtype=np.float64),
+        np.asarray(v_sum, dtype=np.float64), elite_idx, parents, do_cross, cuts, bits, flip_pos, flip_start, flip_mask,
+        arrays.weights, arrays.values, float(arrays.capacity), _CONSTRAINT_IDS[mode], float(lam),
+        arrays.remove_order, new_pop, fit, w_new, v_new,
+    )
+    return new_pop, fit, w_new, v_new
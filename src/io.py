@@ -7,7 +7,8 @@ Ten moduł odpowiada za *wszystkie operacje wejścia/wyjścia*:
 - wczytywanie instancji problemu plecakowego z plików JSON i JSONL,
 - strumieniowe odczytywanie wielu instancji (plik .jsonl: 1 linia = 1 instancja),
 - bezpieczny zapis wyników pojedynczego uruchomienia GA do plików *.jsonl
-  (1 linia = 1 wynik), co pozwala efektywnie gromadzić duże serie eksperymentów,
+  (1 linia = 1 wynik), co pozwala efektywnie gromadzić duże serie eksperymentów
+  (`JsonlWriter` trzyma plik otwarty przez całą serię),
 - opcjonalne, konfigurowalne *próbkowanie podzbioru przedmiotów* (subset), aby
   umożliwić szybkie testy na fragmentach dużych instancji.
 
@@ -26,14 +27,18 @@ Powiązanie z projektem:
 """
 from __future__ import annotations
 
+import mmap
+import os
 from pathlib import Path
 from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
 try:
     import orjson as _json
 except Exception:
     import json as _json
 
-from .model import Instance, SubsetConfig
+from .model import Instance, InstanceMeta, InstanceRaw, SubsetConfig
 
 
 # --- JSON utils -------------------------------------------------------------------------------------
@@ -41,104 +46,220 @@ def _loads(s: Union[str, bytes]) -> Dict:
     """Parse JSON string/bytes -> dict"""
     return _json.loads(s)
 
+def _np_default(obj):
+    """Tablice i skalary NumPy dla stdlib json (orjson obsługuje je sam przez OPT_SERIALIZE_NUMPY)."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
 def _dumps(obj: Dict) -> str:
     """Dump dict -> JSON string z wyłączonym ascii-escaping i stabilną kolejnością."""
+    return _dumps_bytes(obj).decode("utf-8")
+
+def _dumps_bytes(obj: Dict) -> bytes:
+    """
+    Dump dict -> JSON bytes (UTF-8); orjson zwraca bytes bez dodatkowego dekodowania.
+    Tablice NumPy (np. trace fitnessu) zapisujemy wprost - bez `.tolist()` po stronie wywołującego.
+    """
     if _json.__name__ == "orjson":
-        return _json.dumps(obj).decode("utf-8")         # type: ignore
-    return _json.dumps(obj, ensure_ascii=False)         # type: ignore
+        return _json.dumps(obj, option=_json.OPT_SERIALIZE_NUMPY)         # type: ignore
+    return _json.dumps(obj, ensure_ascii=False, default=_np_default).encode("utf-8")     # type: ignore
 
 
 
 # --- Wczytywanie instancji ---------------------------------------------------------------------------
 def read_json(path: Union[str, Path]) -> Dict:
-    """Wczytuje plik JSON (pojedyncza instancja) i zwraca jego zawartość jako słownik."""
+    """
+    Wczytuje plik JSON (pojedyncza instancja) i zwraca jego zawartość jako słownik.
+    Plik mapujemy w pamięci; orjson parsuje wprost z mapy (memoryview), bez kopii do bytes.
+    """
     p = Path(path)
-    text = p.read_text(encoding="utf-8")
-    return _loads(text)
+    with p.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return _loads(b"")          # pusty plik - ten sam błąd parsera co wcześniej
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if _json.__name__ != "orjson":
+                return _loads(mm[:])
+            with memoryview(mm) as view:
+                return _loads(view)
 
 def iter_jsonl(path: Union[str, Path]) -> Iterator[Dict]:
-    """Iteruj po rekordach pliku JSONL (1 linia = 1 instancja), pomijając puste linie."""
+    """
+    Iteruj po rekordach pliku JSONL (1 linia = 1 instancja), pomijając puste linie.
+    Plik jest mapowany w pamięci (mmap), a linie wycinane jako bytes po znaku nowej linii,
+    więc w pamięci trzymamy naraz tylko jedną linię.
+    """
     p = Path(path)
-    with p.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            yield _loads(line)
+    with p.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = mm.size()
+            i = 0
+            while i < size:
+                j = mm.find(b"\n", i)
+                if j == -1:
+                    j = size
+                line = mm[i:j]
+                i = j + 1
+                if not line.strip():
+                    continue
+                yield _loads(line)
             
 def load_instance_from_dict(d: Dict) -> Instance:
     """Zamień słownik na zwalidowaną instancję `Instance` (Pydantic)."""
     return Instance.model_validate(d)
 
+def load_instance_raw_from_dict(d: Dict) -> InstanceRaw:
+    """
+    Zamień słownik na `InstanceRaw` bez budowania obiektów `Item`.
+    Pydantic waliduje tylko capacity/meta; wagi i wartości trafiają wprost do tablic
+    NumPy i są sprawdzane wektorowo (weight > 0, value >= 0).
+    """
+    head = InstanceMeta.model_validate(d)
+    items = d.get("items") or []
+    n = len(items)
+    weights = np.fromiter((it["weight"] for it in items), dtype=np.float64, count=n)
+    values = np.fromiter((it["value"] for it in items), dtype=np.float64, count=n)
+    if n and (not np.all(weights > 0) or not np.all(values >= 0)):
+        raise ValueError("Wagi przedmiotów muszą być > 0, a wartości >= 0")
+    return InstanceRaw(capacity=head.capacity, weights=weights, values=values, meta=head.meta)
+
+def load_instance_raw_trusted_from_dict(d: Dict) -> InstanceRaw:
+    """Jak `load_instance_raw_from_dict`, ale bez walidacji capacity/meta i bez sprawdzania wag/wartości."""
+    items = d.get("items") or []
+    n = len(items)
+    weights = np.fromiter((it["weight"] for it in items), dtype=np.float64, count=n)
+    values = np.fromiter((it["value"] for it in items), dtype=np.float64, count=n)
+    return InstanceRaw(capacity=float(d["capacity"]), weights=weights, values=values, meta=d.get("meta"))
+
 def load_instance(path: Union[str, Path]) -> Instance:
     """Wczytaj pojedynczą instancję z pliku JSON i zwróć obiekt `Instance`."""
     d = read_json(path)
     return load_instance_from_dict(d)
 
-def iter_instances(path: Union[str, Path]) -> Iterator[Instance]:
+def iter_instances(path: Union[str, Path], raw: bool = False, trusted: bool = False) -> Iterator[Union[Instance, InstanceRaw]]:
     """
     Wczytaj jedną lub wiele instancji:
      - *.json -> dokładnie jedna instancja
      - *.jsonl -> wiele instancji (1 linia = 1 instancja)
+    Z `raw=True` zwracamy `InstanceRaw` (tablice NumPy, bez obiektów `Item`).
+    Z `raw=True, trusted=True` pomijamy walidację (dane z własnego generatora) - błędne
+    pliki nie zostaną wtedy wykryte przy wczytywaniu. Dla `Instance` walidacja zostaje:
+    `model_construct` na tysiącach `Item` jest wolniejszy niż walidator pydantic-core,
+    więc `trusted=True` bez `raw=True` to błąd (ValueError).
     """
+    if trusted and not raw:
+        raise ValueError("trusted=True działa tylko z raw=True (Instance jest zawsze walidowana)")
+    if raw:
+        load = load_instance_raw_trusted_from_dict if trusted else load_instance_raw_from_dict
+    else:
+        load = load_instance_from_dict
     p = Path(path)
     if p.suffix == ".jsonl":
         for rec in iter_jsonl(p):
-            yield load_instance_from_dict(rec)
+            yield load(rec)
     elif p.suffix == ".json":
-        yield load_instance_from_dict(read_json(p))
+        yield load(read_json(p))
     else:   # pragma: no cover
         raise ValueError(f"Nieobsługiwany format pliku: {p.suffix}. Obsługiwane: .json, .jsonl")
     
 
 
 # --- Subsetowanie przedmiotów (wybór tylko kilku z całego zbioru) ---------------------------------------
-def apply_subset(inst: Instance, subset: Optional[SubsetConfig]) -> Instance:
+def subset_indices(n: int, subset: Optional[SubsetConfig]) -> Optional[np.ndarray]:
     """
-    Zastosuj reguły subsetowania (none/random/first_k).
-    Zwraca "nową" instancję, a oryginał pozostaje niezmieniony.
+    Zwróć posortowane indeksy przedmiotów wybranych przez subset (None = bez przycinania).
+     - first_k: pierwsze k przedmiotów,
+     - random:  k losowych (random.Random(seed) - te same podzbiory co we wcześniejszych wynikach).
     """
     if not subset or subset.mode == "none":
-        return inst
+        return None
     
-    n = len(inst.items)
     k = min(subset.size, n)
     if subset.mode =="first_k":
-        chosen = inst.items[:k]
-    elif subset.mode == "random":
+        return np.arange(k, dtype=np.intp)
+    if subset.mode == "random":
         import random
         
         rng = random.Random(subset.seed)
         indices = list(range(n))
         rng.shuffle(indices)
-        picked = indices[:k]
-        picked.sort()
-        chosen = [inst.items[i] for i in picked]
-    else:   # pragma: no cover
-        raise ValueError(f"Nieobsługiwany tryb subsetowania: {subset.mode}")
-    
-    # Zwracamy nową instancję z tymi samymmi capacity/meta ale z przyciętymi items
-    data = inst.model_dump()
-    data["items"] = [it.model_dump() for it in chosen]
+        return np.sort(np.asarray(indices[:k], dtype=np.intp))
+    raise ValueError(f"Nieobsługiwany tryb subsetowania: {subset.mode}")   # pragma: no cover
+
+
+def apply_subset(inst: Union[Instance, InstanceRaw], subset: Optional[SubsetConfig]) -> Union[Instance, InstanceRaw]:
+    """
+    Zastosuj reguły subsetowania (none/random/first_k).
+    Zwraca "nową" instancję, a oryginał pozostaje niezmieniony.
+    Przycinamy tylko indeksami (tablice dla `InstanceRaw`, lista `items` dla `Instance`) -
+    bez ponownego zrzutu i walidacji przez Pydantic.
+    """
+    picked = subset_indices(inst.n_items, subset)
+    if picked is None:
+        return inst
     
     # Notujemy w meta, że zastosowano subsetowanie, dla czytelności w wynikach
-    meta = dict(data.get("meta") or {})
+    meta = dict(inst.meta or {})
     meta["subset_applied"] = True
-    meta["subset_mode"] = subset.mode
-    meta["subset_size"] = k
-    data["meta"] = meta
+    meta["subset_mode"] = subset.mode                   # type: ignore
+    meta["subset_size"] = int(picked.size)
+    
+    if isinstance(inst, InstanceRaw):
+        return InstanceRaw(capacity=inst.capacity, weights=inst.weights[picked], values=inst.values[picked], meta=meta)
     
-    return Instance.model_validate(data)
+    # Przedmioty są już zwalidowane - kopiujemy instancję z przyciętą listą items
+    # (model_copy nie uruchamia walidatorów, więc tablice wag/wartości tniemy tym samym indeksem)
+    chosen = [inst.items[i] for i in picked.tolist()]
+    out = inst.model_copy(update={"items": chosen, "meta": meta})
+    out._weights = inst.weights[picked]
+    out._values = inst.values[picked]
+    return out
 
 
 
 # --- Zapis wyników ---------------------------------------------------------------------------------------
+class JsonlWriter:
+    """
+    Dopisywanie wyników (dict -> 1 linia) do pliku JSONL przez jeden otwarty uchwyt.
+
+    Plik otwieramy raz w trybie binarnym z dużym buforem, więc seria tysięcy wyników
+    nie płaci za open/close przy każdej linii. `flush()` wymusza zapis (np. po każdej
+    instancji), a `close()` (lub wyjście z bloku `with`) zamyka plik.
+    """
+
+    def __init__(self, out_path: Union[str, Path], buffer_size: int = 1 << 20) -> None:
+        p = Path(out_path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        self.path = p
+        self._f = p.open("ab", buffering=buffer_size)
+
+    def write(self, run: Dict) -> None:
+        """Dopisz pojedynczy wynik jako jedną linię"""
+        self._f.write(_dumps_bytes(run) + b"\n")
+
+    def flush(self) -> None:
+        """Wypchnij bufor na dysk (punkt kontrolny)"""
+        self._f.flush()
+
+    def close(self) -> None:
+        """Zamknij plik (bufor jest zapisywany przy zamknięciu)"""
+        if not self._f.closed:
+            self._f.close()
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
 def write_run_result(run: Dict, out_path: Union[str, Path]) -> None:
-    """Dopisz pojedynczy wynik (dict) jako jedną linię w wynikowym JSONL"""
+    """Dopisz pojedynczy wynik (dict) jako jedną linię w wynikowym JSONL (dla serii użyj `JsonlWriter`)"""
     p = Path(out_path)
     p.parent.mkdir(parents=True, exist_ok=True)
-    line = _dumps(run)
-    with p.open("a", encoding='utf-8') as f:
-        f.write(line)
-        f.write("\n")
-        f.close()
\ No newline at end of file
+    with p.open("ab") as f:
+        f.write(_dumps_bytes(run) + b"\n")
@@ -5,6 +5,8 @@ Cel i rola w projekcie
 ----------------------
 Zawiera *modele danych* (Pydantic v2) używane w całym projekcie:
 - `Item` i `Instance` - reprezentacja wejściowej instancji problemu plecakowego,
+- `InstanceMeta` i `InstanceRaw` - "lekka" instancja: Pydantic waliduje tylko
+  capacity/meta, a przedmioty trafiają od razu do tablic NumPy (duże instancje),
 - `Params` i pomocnicze konfiguracje (`SelectionConfig`, `ConstraintConfig`,
   `EarlyStopConfig`, `SubsetConfig`, `TraceConfig`) - scalają wszystkie parametry
   algorytmu i uruchomienia w *jednym, walidowanym miejscu*.
@@ -20,8 +22,11 @@ Powiązanie z projektem:
 """
 from __future__ import annotations
 
+from dataclasses import dataclass
 from typing import Any, List, Literal, Optional
-from pydantic import BaseModel, Field, field_validator
+
+import numpy as np
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, model_validator
 
 
 
@@ -38,11 +43,52 @@ class Instance(BaseModel):
     capacity: float = Field(gt=0, description="Pojemność plecaka (>0)")
     items: List[Item] = Field(default_factory=list)
     meta: Optional[dict[str, Any]] = None
+
+    # wagi/wartości jako tablice NumPy - liczone raz po walidacji (nie są polami modelu)
+    _weights: Optional[np.ndarray] = PrivateAttr(default=None)
+    _values: Optional[np.ndarray] = PrivateAttr(default=None)
+
+    @model_validator(mode="after")
+    def _build_arrays(self) -> "Instance":
+        n = len(self.items)
+        self._weights = np.fromiter((it.weight for it in self.items), dtype=np.float64, count=n)
+        self._values = np.fromiter((it.value for it in self.items), dtype=np.float64, count=n)
+        return self
+
+    @property
+    def weights(self) -> np.ndarray:
+        """Wektor wag (n,) float64 - ten sam interfejs co `InstanceRaw.weights`"""
+        return self._weights
+
+    @property
+    def values(self) -> np.ndarray:
+        """Wektor wartości (n,) float64 - ten sam interfejs co `InstanceRaw.values`"""
+        return self._values
     
     @property
     def n_items(self) -> int:
         """Zwraca liczbę przedmotów w instancji"""
         return len(self.items)
+
+
+class InstanceMeta(BaseModel):
+    """Instancja bez listy przedmiotów: walidujemy tylko capacity i meta"""
+    capacity: float = Field(gt=0, description="Pojemność plecaka (>0)")
+    meta: Optional[dict[str, Any]] = None
+
+
+@dataclass(frozen=True)
+class InstanceRaw:
+    """Instancja w postaci tablic NumPy (bez obiektów `Item`) - szybkie wczytywanie dużych instancji"""
+    capacity: float
+    weights: np.ndarray
+    values: np.ndarray
+    meta: Optional[dict[str, Any]] = None
+
+    @property
+    def n_items(self) -> int:
+        """Zwraca liczbę przedmotów w instancji"""
+        return int(self.weights.shape[0])
     
     
     
@@ -78,6 +124,10 @@ class TraceConfig(BaseModel):
     """Co logować w śladzie przebiegu"""
     store_best_per_gen: bool = True
     store_avg_per_gen: bool = True
+    # najlepszy chromosom każdej generacji (trzymany spakowany: n/8 bajtów na generację)
+    store_best_bits_per_gen: bool = False
+    # zapis best_bits (i trace_best_bits) w JSONL: "str" = '0101...', "b64" = base64(np.packbits(bits)) (~6x krócej)
+    best_bits_encoding: Literal["str", "b64"] = "str"
     
 
 class Params(BaseModel):
@@ -97,6 +147,12 @@ class Params(BaseModel):
 
     runs: int = Field(1, ge=1)
     seeds: List[int] = Field(default_factory=lambda: [0])
+    bit_generator: Literal["pcg64", "pcg64dxsm", "sfc64"] = Field(
+        "pcg64", description="Generator bitów NumPy dla RNG runu (sfc64 - najszybszy)"
+    )
+    seed_strategy: Literal["list", "spawn"] = Field(
+        "list", description='"list" - run r dostaje seeds[r]; "spawn" - SeedSequence(seeds[0]).spawn(runs) dla kolejnych instancji'
+    )
 
     subset: SubsetConfig = Field(default_factory=SubsetConfig)                      # type: ignore
     trace: TraceConfig = Field(default_factory=TraceConfig)
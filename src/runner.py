@@ -11,10 +11,10 @@ Ten moduł:
 4) Dla każdego uruchomienia:
    - inicjalizuje generator losowy NumPy (deterministycznie z seed),
    - uruchamia pętlę ewolucji do `max_generations`,
-   - w każdej generacji liczy fitness (przez `fitness.evaluate_population`) i tworzy nowe pokolenie (przez `ga.next_generation`),
+   - w każdej generacji liczy fitness (przez `fitness.evaluate_population`) i tworzy nowe pokolenie (przez `ga.next_generation_evaluated`),
    - realizuje early-stop (patience/min_delta),
    - zbiera trace (best/avg per generacja) jeżeli włączone w `Params.trace`.
-5) Zapisuje wynik każdego uruchomienia do JSONL poprzez `io.write_run_result`
+5) Zapisuje wynik każdego uruchomienia do JSONL poprzez `io.JsonlWriter`
    (1 linia = 1 run), co ułatwia późniejszą analizę w rozdziale 4 sprawozdania.
 
 Jak łączy się z resztą:
@@ -29,56 +29,152 @@ Założenia:
 """
 from __future__ import annotations
 
+import base64
+import multiprocessing
+import os
 import time
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple, Union
 
 import numpy as np
-try:
+
+if TYPE_CHECKING:   # pragma: no cover
     from rich.console import Console  # type: ignore
-    console = Console()
-except Exception:  # pragma: no cover
-    console = None
 
-from .model import Params, Instance
-from .io import iter_instances, apply_subset, write_run_result
-from .fitness import build_item_arrays, evaluate_population, population_values
-from .ga import init_population, next_generation
+from .model import Params, Instance, InstanceRaw
+from .io import iter_instances, apply_subset, JsonlWriter
+from .fitness import InstanceArrays, build_instance_arrays, evaluate_population, population_values
+from .ga import init_population, make_rng, next_generation_evaluated, resolve_pm
+
+
+# --- Pomocnicze: konsola (rich importujemy dopiero przy pierwszym logu) -------------------------------------------
+_console: Any = None        # None = jeszcze nie próbowano, False = rich niedostępny
+
+
+def _get_console() -> Optional["Console"]:
+    """Zwróć współdzieloną konsolę rich (leniwy import) albo None, gdy rich nie jest zainstalowany."""
+    global _console
+    if _console is None:
+        try:
+            from rich.console import Console  # type: ignore
+            _console = Console()
+        except Exception:  # pragma: no cover
+            _console = False
+    return _console or None
+
 
 
 # --- Pomocnicze: kodowanie chromosomu do JSON ----------------------------------------------------------------------
 def bits_to_str(bits: np.ndarray) -> str:
     """Zamień wektor 0/1 na krótki zapis tekstowy '010101...' (mniejsze wyniki w JSONL)."""
-    # bits jest np.int8, więc mapujemy na znaki
-    return "".join("1" if b else "0" for b in bits.tolist())
+    # 0/1 + ord('0') daje bajty b'0'/b'1' - jedna operacja NumPy zamiast pętli po znakach
+    return (bits.astype(np.uint8) + 48).tobytes().decode("ascii")
+
+
+def bits_to_b64(bits: np.ndarray) -> str:
+    """
+    Zapis zwarty: base64 z `np.packbits(bits)` (8 genów na bajt, kolejność big-endian).
+    Odczyt: `np.unpackbits(np.frombuffer(base64.b64decode(s), np.uint8))[:n_items]`.
+    """
+    return base64.b64encode(np.packbits(bits.astype(np.uint8, copy=False)).tobytes()).decode("ascii")
+
+
+def packed_rows_to_list(packed: np.ndarray, n: int, b64: bool) -> List[str]:
+    """Zakoduj spakowane wiersze (np.packbits) - każdy jak `best_bits` (b64 wprost z bajtów albo '0101...')."""
+    if b64:
+        return [base64.b64encode(row.tobytes()).decode("ascii") for row in packed]
+    bits = np.unpackbits(packed, axis=1, count=n)
+    return [bits_to_str(row) for row in bits]
+
+
+
+# Co ile generacji sprawdzamy limit czasu (odczyt zegara nie w każdej iteracji)
+TIME_CHECK_EVERY = 8
+
+
+
+# --- Pomocnicze: seedy runów --------------------------------------------------------------------------------------
+def run_seeds(params: Params, parent: Optional[np.random.SeedSequence] = None) -> List[Union[int, np.random.SeedSequence]]:
+    """
+    Seedy dla `params.runs` przebiegów:
+    - "list":  seeds[r]; krótszą listę dopełniamy kolejnymi liczbami (powtarzalnie),
+    - "spawn": potomne `parent.spawn(runs)` (domyślnie parent = SeedSequence(seeds[0])) -
+      niezależne strumienie (także między procesami puli), odtwarzalne z (entropy, spawn_key).
+      Wspólny `parent` dla całego eksperymentu daje każdej instancji kolejne, różne strumienie.
+    "list" zachowuje tylko przypisanie run -> seed; wyniki starszych wersji kodu i tak nie
+    odtwarzają się seed w seed (zmieniła się kolejność losowań - patrz README, "Powtarzalność").
+    """
+    seeds = list(params.seeds)
+    if params.seed_strategy == "spawn":
+        if parent is None:
+            parent = np.random.SeedSequence(seeds[0] if seeds else 0)
+        return parent.spawn(params.runs)
+    if len(seeds) < params.runs:
+        seeds = seeds + list(range(len(seeds), params.runs))
+    return [int(s) for s in seeds]
+
+
+def seed_fields(seed: Union[int, np.random.SeedSequence]) -> Dict[str, Any]:
+    """Pola wyniku identyfikujące seed: liczba albo entropy + spawn_key potomnego SeedSequence."""
+    if isinstance(seed, np.random.SeedSequence):
+        return {"seed": int(seed.entropy), "seed_spawn_key": list(seed.spawn_key)}
+    return {"seed": int(seed)}
 
 
 
 # --- Pomocnicze: wybór najlepszego osobnika ------------------------------------------------------------------------
 def best_of_population(pop: np.ndarray, fitness: np.ndarray) -> Tuple[int, float]:
     """Zwróć (index_best, best_fitness)."""
-    i = int(np.argmax(fitness))
-    return i, float(fitness[i])
+    i = int(fitness.argmax())
+    return i, fitness.item(i)       # item() daje od razu float Pythona (bez skalara NumPy i float())
+
+
+
+# --- Pomocnicze: log postępu -------------------------------------------------------------------------------------
+def _log_generation(gen_reached: int, max_gen: int, best_fit: float, best_weight: float, capacity: float, fill_pct: float, elapsed: float) -> None:
+    """Wypisz linię postępu (formatowanie tylko wtedy, gdy faktycznie logujemy)."""
+    msg = (
+      f"[[bold yellow]Generation[/bold yellow]] [bold white]{gen_reached}/{max_gen}[/bold white]  "
+      f"[bold green]best_fit[/bold green] = [white]{best_fit:.3f}[/white]  "
+      f"[bold green]best_w[/bold green] = [white]{best_weight:.2f}/{capacity:.2f}[/white] [cyan](≈{fill_pct:.3f}%)[/cyan]  "
+      f"[bold green]elapsed[/bold green] = [white]{elapsed:.1f}s[/white]"
+    )
+    console = _get_console()
+    if console:
+      console.print(msg)
+    else:
+      print(msg)
 
 
 
 # --- Pojedynczy run GA dla jednej instancji ------------------------------------------------------------------------
-def run_single_ga(instance: Instance, params: Params, seed: int, time_limit_sec: float = 0.0, log_every: int = 50, run_index: int = 0) -> Dict[str, Any]:
+def run_single_ga(instance: Union[Instance, InstanceRaw], params: Params, seed: Union[int, np.random.SeedSequence], time_limit_sec: float = 0.0, log_every: int = 50, run_index: int = 0, arrays: Optional[InstanceArrays] = None, params_dump: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Uruchom GA dla pojedynczej instancji i pojedynczego seeda.
+    `arrays` (z `fitness.build_instance_arrays`) można zbudować raz na instancję i
+    przekazać do wszystkich runów; bez niego budujemy je tutaj. Tak samo `params_dump`
+    (`params.model_dump(mode="json", by_alias=True)`) - serializujemy raz na eksperyment.
+    `seed` to liczba albo potomny `SeedSequence` (strategia "spawn", patrz `run_seeds`).
 
     Zwraca słownik gotowy do zapisania jako 1 linia w JSONL.
     """
     stopped_reason = "max_generations"
     t0 = time.time()
+    t0_ns = time.monotonic_ns()
 
-    # 1) Przygotowanie danych instancji (NumPy arrays)
-    weights, values = build_item_arrays(instance)
-    capacity = float(instance.capacity)
-    n = int(weights.shape[0])
+    # 1) Przygotowanie danych instancji (NumPy arrays, LUT-y, kolejność naprawy)
+    if arrays is None:
+        arrays = build_instance_arrays(instance)
+    weights, values = arrays.weights, arrays.values
+    capacity = arrays.capacity
+    n = arrays.n_items
+    w_lut, v_lut = arrays.w_lut, arrays.v_lut
+    remove_order = arrays.remove_order
 
     # 2) RNG deterministyczny
-    rng = np.random.default_rng(seed)
+    rng = make_rng(seed, params.bit_generator)
 
     # 3) Populacja startowa
     pop = init_population(params.population, n, rng)  # (P,n) int8
@@ -91,17 +187,22 @@ def run_single_ga(instance: Instance, params: Params, seed: int, time_limit_sec:
         capacity=capacity,
         constraint_mode=params.constraint.mode,
         lambda_=params.constraint.lambda_,
+        w_lut=w_lut,
+        v_lut=v_lut,
+        remove_order=remove_order,
     )
 
-    # 5) Trace (opcjonalnie)
-    trace_best: List[float] = []
-    trace_avg: List[float] = []
+    # 5) Trace (opcjonalnie) - bufory na całą serię generacji, przycinane na końcu
+    trace_best = np.empty(params.max_generations if params.trace.store_best_per_gen else 0, dtype=np.float64)
+    trace_avg = np.empty(params.max_generations if params.trace.store_avg_per_gen else 0, dtype=np.float64)
+    # chromosomy per generacja: jeden blok (max_gen, ceil(n/8)) uint8 zamiast kopii per generacja
+    trace_bits = np.empty((params.max_generations if params.trace.store_best_bits_per_gen else 0, (n + 7) // 8), dtype=np.uint8)
 
     # 6) Tracking best global
     best_idx, best_fit = best_of_population(pop, fitness)
-    best_bits = pop[best_idx].copy()
-    best_weight = float(w_sum[best_idx])
-    best_value = float(v_sum[best_idx])
+    best_bits = pop[best_idx].copy()      # jedyna alokacja - kolejne poprawy kopiujemy w miejscu
+    best_weight = w_sum.item(best_idx)
+    best_value = v_sum.item(best_idx)
 
     # 7) Early-stop bookkeeping
     patience = int(params.early_stop.patience)
@@ -109,36 +210,45 @@ def run_single_ga(instance: Instance, params: Params, seed: int, time_limit_sec:
     no_improve = 0
     best_ref = best_fit  # referencja do porównania poprawy
 
-    # 8) Pętla generacji
+    # 8) Pętla generacji (stałe z Params wyciągamy do zmiennych lokalnych - poza pętlą)
+    max_gen = int(params.max_generations)
+    store_best = bool(params.trace.store_best_per_gen)
+    store_avg = bool(params.trace.store_avg_per_gen)
+    store_bits = bool(params.trace.store_best_bits_per_gen)
+    b64_bits = params.trace.best_bits_encoding == "b64"
+    pm_rate = resolve_pm(params.pm, n)        # "1/n" rozwiązujemy raz na run, nie w każdej generacji
+    # limit czasu: zegar monotoniczny sprawdzany co TIME_CHECK_EVERY generacji (0 = bez limitu -> nigdy)
+    next_time_check = 1 if time_limit_sec > 0 else 0
+    deadline_ns = t0_ns + int(time_limit_sec * 1e9)
+
+    # log w generacji 1, potem co `log_every` - licznik zamiast modulo w każdej iteracji
+    next_log_gen = 1 if log_every > 0 else 0
+    inv_capacity = 1.0 / capacity
     gen_reached = 0
-    for gen in range(params.max_generations):
+    for gen in range(max_gen):
         gen_reached = gen + 1
         
-        if log_every > 0 and (gen == 0 or gen_reached % log_every == 0):
-          msg = (
-            f"[[bold yellow]Generation[/bold yellow]] [bold white]{gen_reached}/{params.max_generations}[/bold white]  "
-            f"[bold green]best_fit[/bold green] = [white]{best_fit:.3f}[/white]  "
-            f"[bold green]best_w[/bold green] = [white]{best_weight:.2f}/{capacity:.2f}[/white] [cyan](≈{best_weight/capacity*100:.3f}%)[/cyan]  "
-            f"[bold green]elapsed[/bold green] = [white]{time.time() - t0:.1f}s[/white]"
-          )
-          if console:
-            console.print(msg)
-          else:
-            print(msg)
+        if gen_reached == next_log_gen:
+          _log_generation(gen_reached, max_gen, best_fit, best_weight, capacity, best_weight * inv_capacity * 100.0, time.time() - t0)
+          next_log_gen = log_every if gen_reached == 1 and log_every > 1 else next_log_gen + log_every
+
+        # najlepszy w obecnej populacji - jedno argmax na generację, wspólne dla trace i global best
+        cur_best_idx, cur_best_fit = best_of_population(pop, fitness)
 
         # log trace (na podstawie obecnej populacji)
-        if params.trace.store_best_per_gen:
-            trace_best.append(float(np.max(fitness)))
-        if params.trace.store_avg_per_gen:
-            trace_avg.append(float(np.mean(fitness)))
+        if store_best:
+            trace_best[gen] = cur_best_fit
+        if store_avg:
+            trace_avg[gen] = fitness.mean()
+        if store_bits:
+            trace_bits[gen] = np.packbits(pop[cur_best_idx])
 
         # aktualizacja global best
-        cur_best_idx, cur_best_fit = best_of_population(pop, fitness)
         if cur_best_fit > best_fit:
             best_fit = cur_best_fit
-            best_bits = pop[cur_best_idx].copy()
-            best_weight = float(w_sum[cur_best_idx])
-            best_value = float(v_sum[cur_best_idx])
+            np.copyto(best_bits, pop[cur_best_idx])
+            best_weight = w_sum.item(cur_best_idx)
+            best_value = v_sum.item(cur_best_idx)
 
         # early-stop: jeśli brak poprawy o min_delta przez patience generacji
         if patience > 0:
@@ -149,29 +259,25 @@ def run_single_ga(instance: Instance, params: Params, seed: int, time_limit_sec:
                 no_improve += 1
                 if no_improve >= patience:
                   stopped_reason = "early_stop"
+                  console = _get_console()
                   if console:
                     console.print(f"[[red]STOPPED[/red]][white]: Early stopping constraint reached.[/white]")
                   else:
                     print("[STOPPED]: Early stopping constraint reached.")
                   break
 
-        if time_limit_sec and (time.time() - t0) >= time_limit_sec:
-          stopped_reason = "time_limit"
-          if console:
-            console.print(f"[[red]STOPPED[/red]][white]: Time limit reached.[/white]")
-          break
-
-        # next generation
-        pop_next = next_generation(pop, fitness, params, rng)
-
-        # evaluate nowej populacji
-        pop, fitness, w_sum, v_sum = evaluate_population(
-            pop=pop_next,
-            weights=weights,
-            values=values,
-            capacity=capacity,
-            constraint_mode=params.constraint.mode,
-            lambda_=params.constraint.lambda_,
+        if gen_reached == next_time_check:
+            if time.monotonic_ns() >= deadline_ns:
+              stopped_reason = "time_limit"
+              console = _get_console()
+              if console:
+                console.print(f"[[red]STOPPED[/red]][white]: Time limit reached.[/white]")
+              break
+            next_time_check += TIME_CHECK_EVERY
+
+        # next generation + evaluate (z Numbą jeden skompilowany przebieg)
+        pop, fitness, w_sum, v_sum = next_generation_evaluated(
+            pop, fitness, w_sum, v_sum, params, rng, arrays, pm_rate
         )
 
     # 9) Finalny feasibility (waga <= capacity)
@@ -186,8 +292,8 @@ def run_single_ga(instance: Instance, params: Params, seed: int, time_limit_sec:
         "capacity": capacity,
         "n_items": n,
 
-        "seed": seed,
-        "params": params.model_dump(mode="json", by_alias=True),
+        **seed_fields(seed),
+        "params": params_dump if params_dump is not None else params.model_dump(mode="json", by_alias=True),
 
         "gen_reached": gen_reached,
         "time_sec": elapsed,
@@ -197,55 +303,137 @@ def run_single_ga(instance: Instance, params: Params, seed: int, time_limit_sec:
         "best_weight": float(best_weight),
         "feasible": feasible,
 
-        "best_bits": bits_to_str(best_bits),
+        "best_bits": bits_to_b64(best_bits) if b64_bits else bits_to_str(best_bits),
         
         "time_limit_sec": float(time_limit_sec),
         "stopped_reason": stopped_reason,
     }
 
     # Trace dopisujemy tylko jeśli włączony (żeby wyniki nie były gigantyczne)
-    if params.trace.store_best_per_gen:
-        result["trace_best_fitness"] = trace_best
-    if params.trace.store_avg_per_gen:
-        result["trace_avg_fitness"] = trace_avg
+    if b64_bits:
+        result["best_bits_encoding"] = "b64"
+    # (tablice NumPy - `io.JsonlWriter` serializuje je bezpośrednio)
+    if store_best:
+        result["trace_best_fitness"] = trace_best[:gen_reached]
+    if store_avg:
+        result["trace_avg_fitness"] = trace_avg[:gen_reached]
+    if store_bits:
+        result["trace_best_bits"] = packed_rows_to_list(trace_bits[:gen_reached], n, b64_bits)
 
     return result
 
 
 # --- Publiczny interfejs: uruchom eksperymenty ---------------------------------------------------------------------
-def run_experiment(instance_path: Path, params: Params, out_path: Path, time_limit_sec: float = 0.0, log_every: int = 50) -> None:
+def _init_worker() -> None:
+    """
+    Inicjalizacja procesu puli: jeden wątek Numby na proces. Równoległość daje już pula -
+    bez tego każdy worker uruchamiałby kernele `parallel=True` na wszystkich rdzeniach.
+    """
+    try:
+        import numba  # type: ignore
+        numba.set_num_threads(1)
+    except Exception:  # pragma: no cover
+        pass
+
+
+def _run_instance_parallel(executor: ProcessPoolExecutor, inst2: InstanceRaw, arrays: InstanceArrays, params: Params, params_dump: Dict[str, Any], seeds: List[Union[int, np.random.SeedSequence]], time_limit_sec: float, writer: JsonlWriter) -> None:
+    """
+    Wszystkie runy jednej instancji w puli procesów.
+    Workery nie logują (log_every=0), wynik zapisuje tylko proces główny - w kolejności ukończenia.
+    """
+    name = (inst2.meta or {}).get('name', '?')
+    futures = {
+        executor.submit(run_single_ga, inst2, params, seeds[r], time_limit_sec, 0, r, arrays, params_dump): r
+        for r in range(params.runs)
+    }
+    done = 0
+    for fut in as_completed(futures):
+        r = futures[fut]
+        run_dict = fut.result()
+        run_dict["run_index"] = r
+        writer.write(run_dict)
+
+        done += 1
+        console = _get_console()
+        if console:
+          console.print(f"[bold green][DONE][/bold green] [[yellow]Instance[/yellow]: [white]{name}[/white]] [[yellow]Run[/yellow]: [white]{r+1}[/white]] [[yellow]Progress[/yellow]: [white]{done}/{params.runs}[/white]] [[yellow]best_fit[/yellow]: [white]{run_dict['best_fitness']:.3f}[/white]]")
+        else:
+          print(f"Done instance={name} run={r+1} ({done}/{params.runs}) best_fit={run_dict['best_fitness']:.3f}")
+
+
+def run_experiment(instance_path: Path, params: Params, out_path: Path, time_limit_sec: float = 0.0, log_every: int = 50, workers: int = 1, trusted: bool = False) -> None:
     """
     Uruchom serię eksperymentów:
     - wczytuje instancje z instance_path (*.json/*.jsonl),
     - stosuje subsetowanie zgodnie z params.subset,
     - dla każdej instancji uruchamia `params.runs` przebiegów,
     - zapisuje każdy wynik do out_path jako 1 linia JSON.
-    """
-    # Ustalamy listę seedów na runs:
-    # - jeśli seeds jest krótsze niż runs -> uzupełniamy 0.. (powtarzalnie)
-    seeds = list(params.seeds)
-    if len(seeds) < params.runs:
-        # proste dopełnienie deterministyczne
-        seeds = seeds + list(range(len(seeds), params.runs))
 
-    # Iterujemy po instancjach strumieniowo
-    for inst in iter_instances(instance_path):
-        inst2 = apply_subset(inst, params.subset)
-
-        # Każdą instancję uruchamiamy `runs` razy
-        for r in range(params.runs):
-            seed = int(seeds[r])
+    `workers` > 1 (0 = liczba rdzeni) uruchamia runy instancji równolegle w puli procesów.
+    Runy są niezależne i deterministyczne per seed, więc wyniki są te same - zmienia się
+    tylko kolejność linii w JSONL (identyfikuje je `run_index`) i nie ma logów per generacja.
+    `trusted=True` wczytuje instancje bez walidacji (patrz `io.iter_instances`).
+    """
+    # Seedy dla runów: lista z dopełnieniem (te same dla każdej instancji) albo potomne
+    # SeedSequence jednego rodzica na cały eksperyment (spawn per instancja)
+    seed_parent = None
+    if params.seed_strategy == "spawn":
+        seed_parent = np.random.SeedSequence(params.seeds[0] if params.seeds else 0)
+    else:
+        seeds = run_seeds(params)
+
+    # Params są stałe w całym eksperymencie - serializujemy je raz, nie w każdym runie
+    params_dump = params.model_dump(mode="json", by_alias=True)
+
+    n_workers = workers if workers > 0 else (os.cpu_count() or 1)
+    executor = None
+    if n_workers > 1 and params.runs > 1:
+        # "spawn": fork procesu, który już uruchomił wątki Numby, potrafi się zawiesić
+        executor = ProcessPoolExecutor(
+            max_workers=min(n_workers, params.runs),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+        if log_every > 0:
+            msg = f"Runy równolegle (procesy: {min(n_workers, params.runs)}) - log co {log_every} generacji jest wyłączony, linie JSONL w kolejności ukończenia runów."
+            console = _get_console()
             if console:
-              console.print(f"\n\n[bold green][START][/bold green] [[yellow]Instance[/yellow]: [white]{inst2.meta.get('name','?')}[/white]] [[yellow]Run[/yellow]: [white]{r+1}/{params.runs}[/white]] [[yellow]Seed[/yellow]: [white]{seed}[/white]] [[yellow]n[/yellow]=[white]{len(inst2.items)}[/white]]")     # type: ignore
-              line = "="*120
-              console.print(f"[white]{line}[/white]")
+                console.print(f"[yellow]{msg}[/yellow]")
             else:
-              print(f"\n\nStart instance={inst2.meta.get('name','?')} run={r+1}/{params.runs} seed={seed} n={len(inst2.items)}")                          # type: ignore
-
-            run_dict = run_single_ga(inst2, params, seed, time_limit_sec, log_every, run_index=r)
-
-            # Dodatkowe pola identyfikacyjne „run id”
-            run_dict["run_index"] = r
-
-            # Zapis jako JSONL (jedna linia)
-            write_run_result(run_dict, out_path)
\ No newline at end of file
+                print(msg)
+
+    # Iterujemy po instancjach strumieniowo; plik wyników otwieramy raz na całą serię
+    with JsonlWriter(out_path) as writer, (executor or nullcontext()):
+        for inst in iter_instances(instance_path, raw=True, trusted=trusted):      # bez obiektów Item - tylko tablice NumPy
+            inst2 = apply_subset(inst, params.subset)
+            arrays = build_instance_arrays(inst2)      # raz na instancję, wspólne dla wszystkich runów
+            if seed_parent is not None:
+                seeds = run_seeds(params, seed_parent)
+
+            if executor is not None:
+                _run_instance_parallel(executor, inst2, arrays, params, params_dump, seeds, time_limit_sec, writer)
+                writer.flush()
+                continue
+
+            # Każdą instancję uruchamiamy `runs` razy
+            for r in range(params.runs):
+                seed = seeds[r]
+                seed_label = seed if isinstance(seed, int) else f"{seed.entropy}/{list(seed.spawn_key)}"
+                console = _get_console()
+                if console:
+                  console.print(f"\n\n[bold green][START][/bold green] [[yellow]Instance[/yellow]: [white]{inst2.meta.get('name','?')}[/white]] [[yellow]Run[/yellow]: [white]{r+1}/{params.runs}[/white]] [[yellow]Seed[/yellow]: [white]{seed_label}[/white]] [[yellow]n[/yellow]=[white]{inst2.n_items}[/white]]")     # type: ignore
+                  line = "="*120
+                  console.print(f"[white]{line}[/white]")
+                else:
+                  print(f"\n\nStart instance={inst2.meta.get('name','?')} run={r+1}/{params.runs} seed={seed_label} n={inst2.n_items}")                          # type: ignore
+
+                run_dict = run_single_ga(inst2, params, seed, time_limit_sec, log_every, run_index=r, arrays=arrays, params_dump=params_dump)
+
+                # Dodatkowe pola identyfikacyjne „run id”
+                run_dict["run_index"] = r
+
+                # Zapis jako JSONL (jedna linia)
+                writer.write(run_dict)
+
+            # Punkt kontrolny: po każdej instancji wyniki trafiają na dysk
+            writer.flush()
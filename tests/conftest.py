@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Pakiet `src` importujemy z katalogu głównego repozytorium
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
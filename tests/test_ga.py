@@ -0,0 +1,68 @@
+"""
+Zgodność ścieżki z fuzją (`ga.next_generation_evaluated`) z ścieżką referencyjną
+(`ga.next_generation` + `fitness.evaluate_population`): z tego samego seeda obie
+muszą zużywać RNG w tej samej kolejności i dawać identyczne populacje.
+"""
+import itertools
+
+import numpy as np
+import pytest
+
+from src import ga
+from src.fitness import build_instance_arrays, evaluate_population
+from src.model import InstanceRaw, Params
+
+N_ITEMS = 61
+N_GENERATIONS = 6
+
+
+@pytest.fixture(scope="module")
+def arrays():
+  rng = np.random.default_rng(123)
+  weights = np.round(rng.uniform(1.0, 50.0, N_ITEMS), 2)
+  values = np.round(rng.uniform(0.0, 80.0, N_ITEMS), 2)
+  inst = InstanceRaw(capacity=float(weights.sum() * 0.4), weights=weights, values=values)
+  return build_instance_arrays(inst)
+
+
+def _evaluate(pop, params, arrays):
+  return evaluate_population(
+    pop, arrays.weights, arrays.values, arrays.capacity,
+    params.constraint.mode, params.constraint.lambda_,
+    arrays.w_lut, arrays.v_lut, arrays.remove_order,
+  )
+
+
+CASES = list(itertools.product(
+  ["tournament", "roulette"],     # selection
+  ["one_point", "uniform"],       # crossover
+  ["repair", "penalty"],          # constraint
+  ["1/n", 0.2],                   # pm: rzadka i gęsta mutacja
+  [0, 3],                         # elitism
+  [2, 7, 20],                     # population (także nieparzysta liczba dzieci)
+))
+
+
+@pytest.mark.skipif(not ga._HAS_NUMBA, reason="bez Numby obie ścieżki są tym samym kodem")
+@pytest.mark.parametrize("selection,crossover,mode,pm,elitism,population", CASES)
+def test_fused_generation_matches_reference(arrays, selection, crossover, mode, pm, elitism, population):
+  params = Params.model_validate({
+    "population": population, "pc": 0.8, "pm": pm, "elitism": min(elitism, population),
+    "max_generations": N_GENERATIONS, "selection": {"type": selection, "k": 3},
+    "crossover": crossover, "constraint": {"mode": mode, "lambda": 2.0},
+  })
+  rng_ref = ga.make_rng(7)
+  rng_fused = ga.make_rng(7)
+  pop, fit, w_sum, v_sum = _evaluate(ga.init_population(population, N_ITEMS, rng_ref), params, arrays)
+  ga.init_population(population, N_ITEMS, rng_fused)
+
+  for _ in range(N_GENERATIONS):
+    ref = _evaluate(ga.next_generation(pop, fit, params, rng_ref), params, arrays)
+    fused = ga.next_generation_evaluated(pop, fit, w_sum, v_sum, params, rng_fused, arrays)
+
+    np.testing.assert_array_equal(fused[0], ref[0])
+    for got, want in zip(fused[1:], ref[1:]):
+      np.testing.assert_allclose(got, want, rtol=0, atol=1e-9)
+
+    # obie ścieżki kontynuują z tego samego stanu (bez dryfu zaokrągleń float)
+    pop, fit, w_sum, v_sum = ref